@@ -16,24 +16,84 @@ MODULES:
 USE Chinook;
 GO
 
+-- ============================================================
+-- PART 0: DATABASE OPTIONS
+-- ============================================================
+
+-- Row versioning: SNAPSHOT isolation for the optimistic checkout, and
+-- READ_COMMITTED_SNAPSHOT so every READ COMMITTED query reads row versions
+-- instead of waiting on writers' locks. Switching RCSI on needs exclusive
+-- access (ROLLBACK IMMEDIATE disconnects other sessions), so only do it once.
+IF NOT EXISTS (SELECT 1 FROM sys.databases WHERE name = 'Chinook' AND snapshot_isolation_state = 1)
+    ALTER DATABASE Chinook SET ALLOW_SNAPSHOT_ISOLATION ON;
+GO
+IF NOT EXISTS (SELECT 1 FROM sys.databases WHERE name = 'Chinook' AND is_read_committed_snapshot_on = 1)
+    ALTER DATABASE Chinook SET READ_COMMITTED_SNAPSHOT ON WITH ROLLBACK IMMEDIATE;
+GO
+
 -- ============================================================
 -- PART 1: NEW TABLES
 -- ============================================================
 
--- Audit Log (for trigger demo)
+-- Log partitioning (monthly partitions for AuditLog, SchemaChangeLog, BlockedActionLog)
+-- The DDL trigger logs DROP TABLE into SchemaChangeLog, so remove it before dropping
+-- the log tables. It is recreated in PART 2B.
+IF EXISTS (SELECT * FROM sys.triggers WHERE name = 'trg_DDL_SchemaChanges')
+    DROP TRIGGER trg_DDL_SchemaChanges ON DATABASE;
+GO
+
 IF OBJECT_ID('dbo.AuditLog', 'U') IS NOT NULL DROP TABLE dbo.AuditLog;
+IF OBJECT_ID('dbo.AuditLog_Archive', 'U') IS NOT NULL DROP TABLE dbo.AuditLog_Archive;
+IF OBJECT_ID('dbo.SchemaChangeLog', 'U') IS NOT NULL DROP TABLE dbo.SchemaChangeLog;
+IF OBJECT_ID('dbo.SchemaChangeLog_Archive', 'U') IS NOT NULL DROP TABLE dbo.SchemaChangeLog_Archive;
+IF OBJECT_ID('dbo.BlockedActionLog', 'U') IS NOT NULL DROP TABLE dbo.BlockedActionLog;
+IF OBJECT_ID('dbo.BlockedActionLog_Archive', 'U') IS NOT NULL DROP TABLE dbo.BlockedActionLog_Archive;
+IF EXISTS (SELECT * FROM sys.partition_schemes WHERE name = 'ps_LogMonthly') DROP PARTITION SCHEME ps_LogMonthly;
+IF EXISTS (SELECT * FROM sys.partition_functions WHERE name = 'pf_LogMonthly') DROP PARTITION FUNCTION pf_LogMonthly;
+GO
+
+-- One boundary per month: 12 months back to 3 months ahead (RANGE RIGHT = month start)
+DECLARE @Boundaries NVARCHAR(MAX) = N'';
+DECLARE @Month DATE = DATEADD(MONTH, -12, DATEFROMPARTS(YEAR(GETDATE()), MONTH(GETDATE()), 1));
+WHILE @Month <= DATEADD(MONTH, 3, GETDATE())
+BEGIN
+    SET @Boundaries += CASE WHEN @Boundaries = N'' THEN N'' ELSE N', ' END
+                     + N'''' + CONVERT(NCHAR(8), @Month, 112) + N'''';
+    SET @Month = DATEADD(MONTH, 1, @Month);
+END
+EXEC (N'CREATE PARTITION FUNCTION pf_LogMonthly (DATETIME) AS RANGE RIGHT FOR VALUES (' + @Boundaries + N')');
+GO
+
+CREATE PARTITION SCHEME ps_LogMonthly AS PARTITION pf_LogMonthly ALL TO ([PRIMARY]);
 GO
 
+-- Audit Log (for trigger demo)
+-- Clustered on (ChangedAt, LogId) so date-range queries only touch matching partitions
 CREATE TABLE AuditLog (
-    LogId INT IDENTITY(1,1) PRIMARY KEY,
+    LogId INT IDENTITY(1,1),
     TableName VARCHAR(50),
     Operation VARCHAR(10),
     RecordId INT,
     OldValue NVARCHAR(500),
     NewValue NVARCHAR(500),
     ChangedBy VARCHAR(100) DEFAULT SYSTEM_USER,
-    ChangedAt DATETIME DEFAULT GETDATE()
-);
+    ChangedAt DATETIME NOT NULL DEFAULT GETDATE(),
+    CONSTRAINT PK_AuditLog PRIMARY KEY CLUSTERED (ChangedAt, LogId)
+) ON ps_LogMonthly(ChangedAt);
+GO
+
+-- Archive staging table: old partitions are switched in here, exported, then truncated
+CREATE TABLE AuditLog_Archive (
+    LogId INT IDENTITY(1,1),
+    TableName VARCHAR(50),
+    Operation VARCHAR(10),
+    RecordId INT,
+    OldValue NVARCHAR(500),
+    NewValue NVARCHAR(500),
+    ChangedBy VARCHAR(100) DEFAULT SYSTEM_USER,
+    ChangedAt DATETIME NOT NULL DEFAULT GETDATE(),
+    CONSTRAINT PK_AuditLog_Archive PRIMARY KEY CLUSTERED (ChangedAt, LogId)
+) ON [PRIMARY];
 GO
 
 -- Support Tickets (for concurrency demo)
@@ -46,10 +106,16 @@ CREATE TABLE SupportTicket (
     Subject VARCHAR(200),
     Status VARCHAR(20) DEFAULT 'Open',
     AssignedTo INT NULL FOREIGN KEY REFERENCES Employee(EmployeeId),
-    CreatedAt DATETIME DEFAULT GETDATE()
+    CreatedAt DATETIME DEFAULT GETDATE(),
+    ExternalRef NVARCHAR(100) NULL  -- Id in the source system (mail/chat) for bulk imports
 );
 GO
 
+-- One ticket per external reference (dedupe key for bulk ingestion)
+CREATE UNIQUE NONCLUSTERED INDEX UX_SupportTicket_ExternalRef
+    ON SupportTicket(ExternalRef) WHERE ExternalRef IS NOT NULL;
+GO
+
 -- Sample tickets
 INSERT INTO SupportTicket (CustomerId, Subject, Status)
 VALUES (1, 'Download issue', 'Open'),
@@ -101,24 +167,30 @@ PRINT 'DML Trigger created.';
 -- PART 2B: DDL TRIGGER (Schema Change Logging)
 -- ============================================================
 
--- Table to log schema changes
-IF OBJECT_ID('dbo.SchemaChangeLog', 'U') IS NOT NULL DROP TABLE dbo.SchemaChangeLog;
+-- Table to log schema changes (partitioned monthly on EventDate)
+CREATE TABLE SchemaChangeLog (
+    LogId INT IDENTITY(1,1),
+    EventType VARCHAR(50),
+    ObjectName VARCHAR(100),
+    SQLCommand NVARCHAR(MAX),
+    LoginName VARCHAR(100),
+    EventDate DATETIME NOT NULL DEFAULT GETDATE(),
+    CONSTRAINT PK_SchemaChangeLog PRIMARY KEY CLUSTERED (EventDate, LogId)
+) ON ps_LogMonthly(EventDate);
 GO
 
-CREATE TABLE SchemaChangeLog (
-    LogId INT IDENTITY(1,1) PRIMARY KEY,
+CREATE TABLE SchemaChangeLog_Archive (
+    LogId INT IDENTITY(1,1),
     EventType VARCHAR(50),
     ObjectName VARCHAR(100),
     SQLCommand NVARCHAR(MAX),
     LoginName VARCHAR(100),
-    EventDate DATETIME DEFAULT GETDATE()
-);
+    EventDate DATETIME NOT NULL DEFAULT GETDATE(),
+    CONSTRAINT PK_SchemaChangeLog_Archive PRIMARY KEY CLUSTERED (EventDate, LogId)
+) ON [PRIMARY];
 GO
 
 -- DDL Trigger: Logs CREATE, ALTER, DROP events on database
-IF EXISTS (SELECT * FROM sys.triggers WHERE name = 'trg_DDL_SchemaChanges')
-    DROP TRIGGER trg_DDL_SchemaChanges ON DATABASE;
-GO
 
 CREATE TRIGGER trg_DDL_SchemaChanges
 ON DATABASE
@@ -146,19 +218,29 @@ PRINT 'DDL Trigger created.';
 -- PART 2C: INSTEAD OF TRIGGER (Block Unauthorized Deletes)
 -- ============================================================
 
--- Table to log blocked delete attempts
-IF OBJECT_ID('dbo.BlockedActionLog', 'U') IS NOT NULL DROP TABLE dbo.BlockedActionLog;
+-- Table to log blocked delete attempts (partitioned monthly on AttemptedAt)
+CREATE TABLE BlockedActionLog (
+    LogId INT IDENTITY(1,1),
+    TableName VARCHAR(50),
+    AttemptedAction VARCHAR(20),
+    RecordId INT,
+    AttemptedBy VARCHAR(100) DEFAULT SYSTEM_USER,
+    AttemptedAt DATETIME NOT NULL DEFAULT GETDATE(),
+    Reason VARCHAR(200),
+    CONSTRAINT PK_BlockedActionLog PRIMARY KEY CLUSTERED (AttemptedAt, LogId)
+) ON ps_LogMonthly(AttemptedAt);
 GO
 
-CREATE TABLE BlockedActionLog (
-    LogId INT IDENTITY(1,1) PRIMARY KEY,
+CREATE TABLE BlockedActionLog_Archive (
+    LogId INT IDENTITY(1,1),
     TableName VARCHAR(50),
     AttemptedAction VARCHAR(20),
     RecordId INT,
     AttemptedBy VARCHAR(100) DEFAULT SYSTEM_USER,
-    AttemptedAt DATETIME DEFAULT GETDATE(),
-    Reason VARCHAR(200)
-);
+    AttemptedAt DATETIME NOT NULL DEFAULT GETDATE(),
+    Reason VARCHAR(200),
+    CONSTRAINT PK_BlockedActionLog_Archive PRIMARY KEY CLUSTERED (AttemptedAt, LogId)
+) ON [PRIMARY];
 GO
 
 -- Create a view on Artist to apply INSTEAD OF trigger
@@ -193,6 +275,62 @@ GO
 
 PRINT 'INSTEAD OF Trigger created.';
 
+-- ============================================================
+-- PART 2D: PLAYLIST CHANGE TRACKING (Incremental index refresh)
+-- ============================================================
+
+-- Every PlaylistTrack insert/update/delete is recorded so the frontend's in-memory
+-- playlist index can apply only the changes since its last refresh.
+-- Readers page by RowVer below MIN_ACTIVE_ROWVERSION(): unlike an IDENTITY
+-- watermark, that bound never skips a change whose transaction commits late.
+IF OBJECT_ID('dbo.PlaylistTrackChangeLog', 'U') IS NOT NULL DROP TABLE dbo.PlaylistTrackChangeLog;
+IF OBJECT_ID('dbo.PlaylistIndexWatermark', 'U') IS NOT NULL DROP TABLE dbo.PlaylistIndexWatermark;
+GO
+
+CREATE TABLE PlaylistTrackChangeLog (
+    ChangeId INT IDENTITY(1,1) PRIMARY KEY,
+    PlaylistId INT,
+    TrackId INT,
+    Operation CHAR(1),  -- 'I' = added, 'D' = removed
+    ChangedAt DATETIME DEFAULT GETDATE(),
+    RowVer ROWVERSION
+);
+GO
+
+CREATE NONCLUSTERED INDEX IX_PlaylistTrackChangeLog_RowVer
+    ON PlaylistTrackChangeLog(RowVer) INCLUDE (PlaylistId, TrackId, Operation);
+GO
+
+-- Position each running frontend process has loaded up to (for pruning the change log)
+CREATE TABLE PlaylistIndexWatermark (
+    ProcessId VARCHAR(100) PRIMARY KEY,
+    Watermark BIGINT NOT NULL,  -- CAST(RowVer AS BIGINT): changes below this are applied
+    UpdatedAt DATETIME NOT NULL DEFAULT GETDATE()
+);
+GO
+
+IF OBJECT_ID('trg_PlaylistTrack_Changes', 'TR') IS NOT NULL DROP TRIGGER trg_PlaylistTrack_Changes;
+GO
+
+CREATE TRIGGER trg_PlaylistTrack_Changes
+ON PlaylistTrack
+AFTER INSERT, UPDATE, DELETE
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    -- An UPDATE is logged as 'D' for the old key then 'I' for the new one; the
+    -- deletes are written first so they get the lower RowVer and are applied first
+    INSERT INTO PlaylistTrackChangeLog (PlaylistId, TrackId, Operation)
+    SELECT PlaylistId, TrackId, 'D' FROM deleted;
+    
+    INSERT INTO PlaylistTrackChangeLog (PlaylistId, TrackId, Operation)
+    SELECT PlaylistId, TrackId, 'I' FROM inserted;
+END;
+GO
+
+PRINT 'Playlist change tracking created.';
+
 -- ============================================================
 -- PART 3: STORED PROCEDURES (Requirement 4)
 -- ============================================================
@@ -225,6 +363,18 @@ GO
 -- MODULE 2: Sales Processing
 -- ---------------------------
 
+-- Invoice / InvoiceLine id sequences
+-- Sequence values are handed out outside the transaction, so concurrent checkouts
+-- never collide on MAX(Id) + 1 and never lock each other for id allocation.
+IF OBJECT_ID('dbo.seq_InvoiceId', 'SO') IS NOT NULL DROP SEQUENCE dbo.seq_InvoiceId;
+IF OBJECT_ID('dbo.seq_InvoiceLineId', 'SO') IS NOT NULL DROP SEQUENCE dbo.seq_InvoiceLineId;
+GO
+DECLARE @NextInvoiceId INT = (SELECT ISNULL(MAX(InvoiceId), 0) + 1 FROM Invoice);
+DECLARE @NextLineId INT = (SELECT ISNULL(MAX(InvoiceLineId), 0) + 1 FROM InvoiceLine);
+EXEC ('CREATE SEQUENCE dbo.seq_InvoiceId AS INT START WITH ' + CAST(@NextInvoiceId AS VARCHAR(10)) + ' CACHE 50');
+EXEC ('CREATE SEQUENCE dbo.seq_InvoiceLineId AS INT START WITH ' + CAST(@NextLineId AS VARCHAR(10)) + ' CACHE 50');
+GO
+
 -- Complete Purchase (with Transaction & Isolation Level)
 IF OBJECT_ID('sp_CompletePurchase', 'P') IS NOT NULL DROP PROCEDURE sp_CompletePurchase;
 GO
@@ -240,8 +390,8 @@ BEGIN
     BEGIN TRY
         BEGIN TRANSACTION;
         
-        -- Get next Invoice ID manually (Chinook doesn't have IDENTITY)
-        SELECT @InvoiceId = ISNULL(MAX(InvoiceId), 0) + 1 FROM Invoice;
+        -- Get next Invoice ID from the sequence (Chinook doesn't have IDENTITY)
+        SET @InvoiceId = NEXT VALUE FOR dbo.seq_InvoiceId;
         
         -- Get customer info
         DECLARE @Address NVARCHAR(70), @City NVARCHAR(40), @Country NVARCHAR(40);
@@ -252,9 +402,15 @@ BEGIN
         INSERT INTO Invoice (InvoiceId, CustomerId, InvoiceDate, BillingAddress, BillingCity, BillingCountry, Total)
         VALUES (@InvoiceId, @CustomerId, GETDATE(), @Address, @City, @Country, 0);
         
-        -- Get next InvoiceLine ID
-        DECLARE @NextLineId INT;
-        SELECT @NextLineId = ISNULL(MAX(InvoiceLineId), 0) FROM InvoiceLine;
+        -- Reserve one InvoiceLine ID per track
+        DECLARE @LineCount BIGINT, @FirstLineId SQL_VARIANT, @NextLineId INT;
+        SELECT @LineCount = COUNT(*) FROM Track t
+        JOIN STRING_SPLIT(@TrackIds, ',') s ON t.TrackId = CAST(TRIM(s.value) AS INT);
+        IF @LineCount = 0
+            RAISERROR('No valid tracks in the cart.', 16, 1);
+        EXEC sp_sequence_get_range @sequence_name = N'dbo.seq_InvoiceLineId', @range_size = @LineCount,
+             @range_first_value = @FirstLineId OUTPUT;
+        SET @NextLineId = CAST(@FirstLineId AS INT) - 1;
         
         -- Add tracks with manual IDs
         INSERT INTO InvoiceLine (InvoiceLineId, InvoiceId, TrackId, UnitPrice, Quantity)
@@ -275,6 +431,93 @@ BEGIN
 END;
 GO
 
+-- Complete Purchase - Optimistic mode (SNAPSHOT isolation + retry)
+-- Row versioning lets checkouts and browse queries read without taking
+-- shared/range locks. Conflicts are detected at write time instead and retried.
+IF OBJECT_ID('sp_CompletePurchaseOptimistic', 'P') IS NOT NULL DROP PROCEDURE sp_CompletePurchaseOptimistic;
+GO
+CREATE PROCEDURE sp_CompletePurchaseOptimistic
+    @CustomerId INT,
+    @Cart VARCHAR(MAX),            -- 'TrackId:Price,...' with the prices the customer saw
+    @InvoiceId INT OUTPUT,
+    @RetryCount INT = 0 OUTPUT     -- Conflicts retried before the purchase went through
+AS
+BEGIN
+    SET NOCOUNT ON;
+    SET TRANSACTION ISOLATION LEVEL SNAPSHOT;  -- Row versioning, no range locks
+    DECLARE @Retries INT = 3;
+    SET @RetryCount = 0;
+    
+    DECLARE @Items TABLE (TrackId INT, ExpectedPrice DECIMAL(10,2));
+    INSERT INTO @Items (TrackId, ExpectedPrice)
+    SELECT CAST(LEFT(s.value, CHARINDEX(':', s.value) - 1) AS INT),
+           CAST(SUBSTRING(s.value, CHARINDEX(':', s.value) + 1, 20) AS DECIMAL(10,2))
+    FROM (SELECT TRIM(value) AS value FROM STRING_SPLIT(@Cart, ',')) s
+    WHERE CHARINDEX(':', s.value) > 1;
+    
+    WHILE @Retries > 0
+    BEGIN
+        BEGIN TRY
+            BEGIN TRANSACTION;
+            
+            -- Optimistic validation: every line's price must still match what the
+            -- customer saw (a cart total would let offsetting changes through).
+            -- UPDLOCK makes SNAPSHOT raise 3960 if a price changed after this
+            -- transaction started, instead of silently using the stale version.
+            DECLARE @CurrentTotal DECIMAL(10,2), @LineCount BIGINT, @ChangedCount INT;
+            SELECT @CurrentTotal = ISNULL(SUM(t.UnitPrice), 0), @LineCount = COUNT(*),
+                   @ChangedCount = ISNULL(SUM(CASE WHEN t.UnitPrice <> c.ExpectedPrice THEN 1 ELSE 0 END), 0)
+            FROM Track t WITH (UPDLOCK)
+            JOIN @Items c ON t.TrackId = c.TrackId;
+            
+            IF @LineCount = 0
+            BEGIN
+                ROLLBACK;
+                RAISERROR('No valid tracks in the cart.', 16, 1);
+            END
+            
+            IF @ChangedCount > 0
+            BEGIN
+                ROLLBACK;
+                RAISERROR('Prices changed since the cart was built. Please review your cart.', 16, 1);
+            END
+            
+            SET @InvoiceId = NEXT VALUE FOR dbo.seq_InvoiceId;
+            
+            DECLARE @Address NVARCHAR(70), @City NVARCHAR(40), @Country NVARCHAR(40);
+            SELECT @Address = Address, @City = City, @Country = Country
+            FROM Customer WHERE CustomerId = @CustomerId;
+            
+            INSERT INTO Invoice (InvoiceId, CustomerId, InvoiceDate, BillingAddress, BillingCity, BillingCountry, Total)
+            VALUES (@InvoiceId, @CustomerId, GETDATE(), @Address, @City, @Country, @CurrentTotal);
+            
+            DECLARE @FirstLineId SQL_VARIANT, @NextLineId INT;
+            EXEC sp_sequence_get_range @sequence_name = N'dbo.seq_InvoiceLineId', @range_size = @LineCount,
+                 @range_first_value = @FirstLineId OUTPUT;
+            SET @NextLineId = CAST(@FirstLineId AS INT) - 1;
+            
+            INSERT INTO InvoiceLine (InvoiceLineId, InvoiceId, TrackId, UnitPrice, Quantity)
+            SELECT @NextLineId + ROW_NUMBER() OVER (ORDER BY t.TrackId), @InvoiceId, t.TrackId, t.UnitPrice, 1
+            FROM Track t
+            JOIN @Items c ON t.TrackId = c.TrackId;
+            
+            COMMIT;
+            RETURN;
+        END TRY
+        BEGIN CATCH
+            IF @@TRANCOUNT > 0 ROLLBACK;
+            -- 3960 = snapshot update conflict (a price changed mid-checkout), 1205 = deadlock victim
+            IF ERROR_NUMBER() IN (3960, 1205) AND @Retries > 1
+            BEGIN
+                SET @Retries = @Retries - 1;
+                SET @RetryCount = @RetryCount + 1;
+            END
+            ELSE THROW;
+        END CATCH
+    END
+END;
+GO
+
 -- MODULE 3: Support Portal
 -- -------------------------
 
@@ -368,6 +611,169 @@ BEGIN
 END;
 GO
 
+-- MODULE 4: Playlists
+-- --------------------
+
+-- Create Playlist from a comma-separated list of TrackIds
+IF OBJECT_ID('sp_CreatePlaylist', 'P') IS NOT NULL DROP PROCEDURE sp_CreatePlaylist;
+GO
+CREATE PROCEDURE sp_CreatePlaylist
+    @Name NVARCHAR(120),
+    @TrackIds VARCHAR(MAX),
+    @PlaylistId INT OUTPUT
+AS
+BEGIN
+    SET NOCOUNT ON;
+    BEGIN TRY
+        BEGIN TRANSACTION;
+        
+        -- Chinook Playlist table doesn't have IDENTITY, so we manually get next ID
+        SELECT @PlaylistId = ISNULL(MAX(PlaylistId), 0) + 1 FROM Playlist WITH (UPDLOCK, HOLDLOCK);
+        INSERT INTO Playlist (PlaylistId, Name) VALUES (@PlaylistId, @Name);
+        
+        INSERT INTO PlaylistTrack (PlaylistId, TrackId)
+        SELECT DISTINCT @PlaylistId, t.TrackId
+        FROM Track t
+        JOIN STRING_SPLIT(@TrackIds, ',') s ON t.TrackId = CAST(TRIM(s.value) AS INT);
+        
+        COMMIT;
+    END TRY
+    BEGIN CATCH
+        ROLLBACK;
+        THROW;
+    END CATCH
+END;
+GO
+
+-- Prune the playlist change log below the lowest watermark of any live process.
+-- Processes silent for @StaleMinutes are dropped; they do a full reload on their
+-- next refresh because their watermark row is gone.
+IF OBJECT_ID('sp_PrunePlaylistChangeLog', 'P') IS NOT NULL DROP PROCEDURE sp_PrunePlaylistChangeLog;
+GO
+CREATE PROCEDURE sp_PrunePlaylistChangeLog @StaleMinutes INT = 60
+AS
+BEGIN
+    SET NOCOUNT ON;
+    BEGIN TRY
+        BEGIN TRANSACTION;
+        
+        DELETE FROM PlaylistIndexWatermark WITH (TABLOCKX)
+        WHERE UpdatedAt < DATEADD(MINUTE, -@StaleMinutes, GETDATE());
+        
+        -- No live process: everything already committed can go
+        DECLARE @Low BIGINT = (SELECT MIN(Watermark) FROM PlaylistIndexWatermark);
+        IF @Low IS NULL SET @Low = CAST(MIN_ACTIVE_ROWVERSION() AS BIGINT);
+        
+        DELETE FROM PlaylistTrackChangeLog WHERE RowVer < CAST(@Low AS BINARY(8));
+        SELECT @@ROWCOUNT AS RowsPruned;
+        
+        COMMIT;
+    END TRY
+    BEGIN CATCH
+        ROLLBACK;
+        THROW;
+    END CATCH
+END;
+GO
+
+-- Log Retention (partition switch-out + sliding window)
+-- ----------------------------------------------------
+
+-- Switch the oldest non-empty partition that ends on or before @Cutoff into <Table>_Archive.
+-- SWITCH is a metadata-only operation, so the triggers writing the live table are not blocked.
+IF OBJECT_ID('sp_SwitchOutLogPartition', 'P') IS NOT NULL DROP PROCEDURE sp_SwitchOutLogPartition;
+GO
+CREATE PROCEDURE sp_SwitchOutLogPartition @TableName SYSNAME, @Cutoff DATETIME
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    IF @TableName NOT IN ('AuditLog', 'SchemaChangeLog', 'BlockedActionLog')
+    BEGIN
+        RAISERROR('Unknown log table: %s', 16, 1, @TableName);
+        RETURN;
+    END
+    
+    DECLARE @ArchiveName SYSNAME = @TableName + '_Archive';
+    DECLARE @HasRows BIT = 0;
+    DECLARE @Check NVARCHAR(200) = N'IF EXISTS (SELECT 1 FROM dbo.' + QUOTENAME(@ArchiveName) + N') SET @HasRows = 1';
+    EXEC sp_executesql @Check, N'@HasRows BIT OUTPUT', @HasRows = @HasRows OUTPUT;
+    IF @HasRows = 1
+    BEGIN
+        RAISERROR('%s is not empty - export and truncate it first.', 16, 1, @ArchiveName);
+        RETURN;
+    END
+    
+    -- RANGE RIGHT: partition N holds [boundary N-1, boundary N)
+    DECLARE @PartitionNumber INT, @RangeStart DATETIME, @RangeEnd DATETIME, @RowCount BIGINT = 0;
+    SELECT TOP 1 @PartitionNumber = p.partition_number,
+           @RangeStart = CAST(lo.value AS DATETIME),
+           @RangeEnd = CAST(hi.value AS DATETIME),
+           @RowCount = p.rows
+    FROM sys.partitions p
+    JOIN sys.indexes i ON i.object_id = p.object_id AND i.index_id = p.index_id
+    JOIN sys.partition_schemes ps ON ps.data_space_id = i.data_space_id
+    JOIN sys.partition_range_values hi ON hi.function_id = ps.function_id AND hi.boundary_id = p.partition_number
+    LEFT JOIN sys.partition_range_values lo ON lo.function_id = ps.function_id AND lo.boundary_id = p.partition_number - 1
+    WHERE p.object_id = OBJECT_ID('dbo.' + @TableName) AND p.index_id = 1
+      AND p.rows > 0 AND CAST(hi.value AS DATETIME) <= @Cutoff
+    ORDER BY p.partition_number;
+    
+    IF @PartitionNumber IS NOT NULL
+    BEGIN
+        DECLARE @Switch NVARCHAR(300) = N'ALTER TABLE dbo.' + QUOTENAME(@TableName)
+            + N' SWITCH PARTITION ' + CAST(@PartitionNumber AS NVARCHAR(10))
+            + N' TO dbo.' + QUOTENAME(@ArchiveName);
+        EXEC (@Switch);
+    END
+    
+    SELECT @TableName AS TableName, @RangeStart AS RangeStart, @RangeEnd AS RangeEnd,
+           ISNULL(@RowCount, 0) AS RowsSwitched;
+END;
+GO
+
+-- Keep the monthly window rolling: add boundaries ahead of today, merge empty ones behind
+IF OBJECT_ID('sp_MaintainLogPartitions', 'P') IS NOT NULL DROP PROCEDURE sp_MaintainLogPartitions;
+GO
+CREATE PROCEDURE sp_MaintainLogPartitions @MonthsAhead INT = 3
+AS
+BEGIN
+    SET NOCOUNT ON;
+    DECLARE @FunctionId INT = (SELECT function_id FROM sys.partition_functions WHERE name = 'pf_LogMonthly');
+    DECLARE @Boundary DATETIME;
+    
+    -- SPLIT the (empty) trailing partition for each upcoming month
+    SELECT @Boundary = DATEADD(MONTH, 1, MAX(CAST(value AS DATETIME)))
+    FROM sys.partition_range_values WHERE function_id = @FunctionId;
+    WHILE @Boundary <= DATEADD(MONTH, @MonthsAhead, GETDATE())
+    BEGIN
+        ALTER PARTITION SCHEME ps_LogMonthly NEXT USED [PRIMARY];
+        ALTER PARTITION FUNCTION pf_LogMonthly() SPLIT RANGE (@Boundary);
+        SET @Boundary = DATEADD(MONTH, 1, @Boundary);
+    END
+    
+    -- MERGE the lowest boundary while the first two partitions are empty in every log table
+    -- (no data movement) and the boundary is older than the current month
+    SET @Boundary = NULL;
+    WHILE 1 = 1
+    BEGIN
+        SELECT @Boundary = CAST(value AS DATETIME)
+        FROM sys.partition_range_values WHERE function_id = @FunctionId AND boundary_id = 1;
+        
+        IF @Boundary IS NULL
+           OR @Boundary >= DATEFROMPARTS(YEAR(GETDATE()), MONTH(GETDATE()), 1)
+           OR EXISTS (SELECT 1 FROM sys.partitions
+                      WHERE object_id IN (OBJECT_ID('dbo.AuditLog'), OBJECT_ID('dbo.SchemaChangeLog'),
+                                          OBJECT_ID('dbo.BlockedActionLog'))
+                        AND index_id = 1 AND partition_number IN (1, 2) AND rows > 0)
+            BREAK;
+        
+        ALTER PARTITION FUNCTION pf_LogMonthly() MERGE RANGE (@Boundary);
+        SET @Boundary = NULL;
+    END
+END;
+GO
+
 PRINT 'Stored procedures created.';
 
 -- ============================================================
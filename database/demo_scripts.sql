@@ -224,6 +224,37 @@ WHERE GenreId = 1;
 
 GO
 
+-- ============================================================
+-- DEMO 8: LOG PARTITIONING & RETENTION
+-- ============================================================
+-- WHAT IT SHOWS: Log tables are split into monthly partitions
+
+-- Step 1: Rows per monthly partition of AuditLog
+SELECT p.partition_number, prv.value AS PartitionEnd, p.rows
+FROM sys.partitions p
+JOIN sys.indexes i ON i.object_id = p.object_id AND i.index_id = p.index_id
+JOIN sys.partition_schemes ps ON ps.data_space_id = i.data_space_id
+LEFT JOIN sys.partition_range_values prv ON prv.function_id = ps.function_id AND prv.boundary_id = p.partition_number
+WHERE p.object_id = OBJECT_ID('dbo.AuditLog') AND p.index_id = 1
+ORDER BY p.partition_number;
+
+-- Step 2: Turn on Execution Plan (Ctrl+M) and run a date-range query
+-- "Actual Partition Count" on the Clustered Index Seek shows only 1 partition is read
+SELECT * FROM AuditLog
+WHERE ChangedAt >= DATEFROMPARTS(YEAR(GETDATE()), MONTH(GETDATE()), 1)
+ORDER BY ChangedAt DESC, LogId DESC;
+
+-- Step 3: Archive everything older than 6 months (metadata-only SWITCH)
+-- Normally run by: python log_archive.py
+DECLARE @Cutoff DATETIME = DATEADD(MONTH, -6, DATEFROMPARTS(YEAR(GETDATE()), MONTH(GETDATE()), 1));
+EXEC sp_SwitchOutLogPartition @TableName = 'AuditLog', @Cutoff = @Cutoff;
+SELECT COUNT(*) AS ArchivedRows FROM AuditLog_Archive;
+
+-- Step 4: Keep the monthly window rolling
+EXEC sp_MaintainLogPartitions;
+
+GO
+
 -- ============================================================
 -- QUICK TEST: Run all stored procedures
 -- ============================================================
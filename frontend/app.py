@@ -1,5 +1,5 @@
 """
-Chinook Music Store - Simplified Dashboard (3 Modules)
+Chinook Music Store - Simplified Dashboard (4 Modules)
 DAM Semester Project
 """
 
@@ -33,11 +33,11 @@ st.markdown("---")
 st.markdown("""
 <div class="module-card">
     <h3>📋 Project Overview</h3>
-    <p>This application demonstrates key database concepts through 3 modules:</p>
+    <p>This application demonstrates key database concepts through 4 modules:</p>
 </div>
 """, unsafe_allow_html=True)
 
-col1, col2, col3 = st.columns(3)
+col1, col2, col3, col4 = st.columns(4)
 
 with col1:
     st.markdown("""
@@ -78,6 +78,19 @@ with col3:
     </div>
     """, unsafe_allow_html=True)
 
+with col4:
+    st.markdown("""
+    <div class="module-card">
+        <h3>🎶 Playlists</h3>
+        <p><strong>Concepts:</strong></p>
+        <ul>
+            <li>Bitmap Index</li>
+            <li>Change Tracking</li>
+            <li>Stored Procedures</li>
+        </ul>
+    </div>
+    """, unsafe_allow_html=True)
+
 st.markdown("---")
 
 # Test Connection
@@ -0,0 +1,189 @@
+"""
+Checkout benchmark: SERIALIZABLE vs SNAPSHOT (optimistic)
+Runs concurrent purchases against both procedures and reports
+throughput, abort rate and retried conflicts at rising concurrency.
+
+Carts are drawn from a small hot set of tracks (--hot-tracks) so sessions
+actually compete for the same rows, and an optional repricer thread
+(--reprice-every) changes hot-track prices while the benchmark runs.
+Original prices are restored at the end.
+
+Usage:
+    python benchmark_checkout.py [--levels 1 2 4 8 16] [--purchases 20]
+                                 [--hot-tracks 20] [--reprice-every 0.05]
+"""
+
+import argparse
+import random
+import threading
+import time
+
+from db_connection import get_connection, execute_query
+
+CART_SIZE = 3
+
+MODES = {
+    "SERIALIZABLE": """
+        SET NOCOUNT ON;
+        DECLARE @out INT;
+        EXEC sp_CompletePurchase @CustomerId = ?, @TrackIds = ?, @InvoiceId = @out OUTPUT;
+        SELECT @out, 0;
+    """,
+    "SNAPSHOT": """
+        SET NOCOUNT ON;
+        DECLARE @out INT, @retries INT;
+        EXEC sp_CompletePurchaseOptimistic @CustomerId = ?, @Cart = ?,
+             @InvoiceId = @out OUTPUT, @RetryCount = @retries OUTPUT;
+        SELECT @out, @retries;
+    """,
+}
+
+
+def read_prices(cursor, track_ids):
+    """Current prices of the cart's tracks (what the customer sees before paying)."""
+    placeholders = ', '.join('?' for _ in track_ids)
+    cursor.execute(f"SELECT TrackId, UnitPrice FROM Track WHERE TrackId IN ({placeholders})", track_ids)
+    return {int(track_id): float(price) for track_id, price in cursor.fetchall()}
+
+
+def worker(mode, purchases, customers, tracks, results, lock):
+    """Run a batch of purchases on one connection and record the outcomes."""
+    committed, aborted, retries, invoice_ids = 0, 0, 0, []
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        for _ in range(purchases):
+            cart = random.sample(tracks, CART_SIZE)
+            prices = read_prices(cursor, cart)
+            conn.commit()
+            if mode == "SNAPSHOT":
+                params = [random.choice(customers), ','.join(f"{t}:{p:.2f}" for t, p in prices.items())]
+            else:
+                params = [random.choice(customers), ','.join(str(t) for t in cart)]
+            try:
+                cursor.execute(MODES[mode], params)
+                invoice_id, retried = cursor.fetchone()
+                conn.commit()
+                invoice_ids.append(invoice_id)
+                retries += retried or 0
+                committed += 1
+            except Exception:
+                conn.rollback()
+                aborted += 1
+    with lock:
+        results["committed"] += committed
+        results["aborted"] += aborted
+        results["retries"] += retries
+        results["invoice_ids"].extend(invoice_ids)
+
+
+def repricer(prices, interval, stop):
+    """Flip random hot tracks between their original price and +1.00 until stopped."""
+    track_ids = list(prices)
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        while not stop.wait(interval):
+            track_id = random.choice(track_ids)
+            new_price = prices[track_id] + random.choice([0, 1])
+            try:
+                cursor.execute("UPDATE Track SET UnitPrice = ? WHERE TrackId = ?", [new_price, track_id])
+                conn.commit()
+            except Exception:
+                conn.rollback()
+
+
+def restore_prices(prices):
+    """Put the hot tracks back to the prices they had before the benchmark."""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        for track_id, price in prices.items():
+            cursor.execute("UPDATE Track SET UnitPrice = ? WHERE TrackId = ?", [price, track_id])
+        conn.commit()
+
+
+def run_level(mode, threads, purchases, customers, tracks, prices=None, reprice_every=None):
+    """Run one concurrency level and return (committed, aborted, retries, seconds, invoice ids)."""
+    results = {"committed": 0, "aborted": 0, "retries": 0, "invoice_ids": []}
+    lock = threading.Lock()
+    pool = [
+        threading.Thread(target=worker, args=(mode, purchases, customers, tracks, results, lock))
+        for _ in range(threads)
+    ]
+    stop = threading.Event()
+    updater = None
+    if reprice_every:
+        updater = threading.Thread(target=repricer, args=(prices, reprice_every, stop))
+        updater.start()
+    start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - start
+    if updater:
+        stop.set()
+        updater.join()
+    return (results["committed"], results["aborted"], results["retries"],
+            elapsed, results["invoice_ids"])
+
+
+def cleanup(invoice_ids):
+    """Remove invoices created by the benchmark."""
+    if not invoice_ids:
+        return
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        for i in range(0, len(invoice_ids), 500):
+            chunk = invoice_ids[i:i + 500]
+            placeholders = ', '.join('?' for _ in chunk)
+            cursor.execute(f"DELETE FROM InvoiceLine WHERE InvoiceId IN ({placeholders})", chunk)
+            cursor.execute(f"DELETE FROM Invoice WHERE InvoiceId IN ({placeholders})", chunk)
+        conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare checkout isolation modes")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 2, 4, 8, 16],
+                        help="Concurrent sessions to test")
+    parser.add_argument("--purchases", type=int, default=20,
+                        help="Purchases per session")
+    parser.add_argument("--hot-tracks", type=int, default=20,
+                        help="Draw carts from this many tracks (0 = whole catalog)")
+    parser.add_argument("--reprice-every", type=float, metavar="SECONDS",
+                        help="Change a random hot-track price at this interval during each run")
+    parser.add_argument("--keep", action="store_true",
+                        help="Keep the benchmark invoices instead of deleting them")
+    args = parser.parse_args()
+
+    customers = execute_query("SELECT CustomerId FROM Customer")['CustomerId'].tolist()
+    catalog = {
+        int(row.TrackId): float(row.UnitPrice)
+        for row in execute_query("SELECT TrackId, UnitPrice FROM Track").itertuples()
+    }
+    tracks = list(catalog)
+    if args.hot_tracks:
+        tracks = random.sample(tracks, max(CART_SIZE, min(args.hot_tracks, len(tracks))))
+    prices = {t: catalog[t] for t in tracks}
+
+    created = []
+    print(f"{'Mode':<14}{'Sessions':>9}{'Commits':>9}{'Aborts':>8}{'Abort %':>9}"
+          f"{'Retries':>9}{'Tx/sec':>9}")
+    try:
+        for mode in MODES:
+            for level in args.levels:
+                committed, aborted, retries, elapsed, ids = run_level(
+                    mode, level, args.purchases, customers, tracks, prices, args.reprice_every
+                )
+                created.extend(ids)
+                total = committed + aborted
+                abort_rate = 100.0 * aborted / total if total else 0.0
+                print(f"{mode:<14}{level:>9}{committed:>9}{aborted:>8}"
+                      f"{abort_rate:>8.1f}%{retries:>9}{committed / elapsed:>9.1f}")
+    finally:
+        if args.reprice_every:
+            restore_prices(prices)
+        if not args.keep:
+            cleanup(created)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+Shared catalog snapshot for multi-worker deployments
+The builder writes the catalog lookups (artists, albums, tracks, ...) to a
+versioned directory of Arrow IPC files. Every Streamlit worker memory-maps the
+current version, so the data is shared through the OS page cache instead of
+each process holding its own pandas copy. A new version is published by
+atomically replacing the CURRENT pointer file; workers pick it up on their
+next lookup.
+
+Every builder run (publish or "unchanged") also records in CURRENT when the
+live version was last confirmed against the database. Workers ignore a
+snapshot older than MAX_AGE_SECONDS and query the database instead, so a
+catalog write still shows up when no --watch builder is running.
+
+Layout:
+    snapshots/
+        CURRENT              # live version directory name + last check (epoch seconds)
+        v000001/
+            manifest.json    # version, build time, fingerprint, row counts
+            artists.arrow
+            albums.arrow
+            ...
+
+Usage:
+    python catalog_snapshot.py            # Build once (trusted for MAX_AGE_SECONDS)
+    python catalog_snapshot.py --watch 60 # Check every 60s, rebuild when it changes
+"""
+
+import argparse
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import logging
+
+import pandas as pd
+import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DIR = Path(__file__).parent / 'snapshots'
+KEEP_VERSIONS = 3
+# Readers fall back to the database once the snapshot hasn't been confirmed for
+# this long; keep the builder's --watch interval well below it
+MAX_AGE_SECONDS = 300
+
+# Base tables whose changes invalidate the snapshot
+SOURCE_TABLES = ['Artist', 'Album', 'Track', 'Genre', 'MediaType', 'Customer', 'Employee']
+
+
+# ---------------------------------------------------------------
+# Builder
+# ---------------------------------------------------------------
+
+def catalog_fingerprint():
+    """Cheap change detector: row count + aggregate checksum per source table."""
+    from db_connection import execute_query
+    parts = ' UNION ALL '.join(
+        f"SELECT '{t}' AS TableName, COUNT_BIG(*) AS RowTotal, CHECKSUM_AGG(BINARY_CHECKSUM(*)) AS Checksum FROM {t}"
+        for t in SOURCE_TABLES
+    )
+    df = execute_query(parts)
+    return {row['TableName']: [int(row['RowTotal']), int(row['Checksum'] or 0)] for _, row in df.iterrows()}
+
+def read_pointer(snapshot_dir=SNAPSHOT_DIR):
+    """(version name, last checked epoch seconds) from CURRENT, or None if nothing is published."""
+    try:
+        lines = (snapshot_dir / 'CURRENT').read_text().split()
+    except FileNotFoundError:
+        return None
+    checked_at = float(lines[1]) if len(lines) > 1 else 0.0
+    return lines[0], checked_at
+
+def write_pointer(snapshot_dir, name):
+    """Point CURRENT at `name` and stamp it as checked now (atomic replace)."""
+    pointer = snapshot_dir / 'CURRENT.tmp'
+    pointer.write_text(f"{name}\n{time.time():.0f}\n")
+    os.replace(pointer, snapshot_dir / 'CURRENT')
+
+def read_manifest(snapshot_dir=SNAPSHOT_DIR):
+    """Manifest of the live version, or None if no snapshot has been published."""
+    pointer = read_pointer(snapshot_dir)
+    if pointer is None:
+        return None
+    with open(snapshot_dir / pointer[0] / 'manifest.json') as f:
+        return json.load(f)
+
+def write_table(table, path):
+    """Write a pyarrow Table as an Arrow IPC file."""
+    with pa.OSFile(str(path), 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+def build_snapshot(snapshot_dir=SNAPSHOT_DIR, force=False):
+    """Build and publish a new snapshot version. Returns the version, or None if unchanged."""
+    from db_connection import execute_query, CATALOG_QUERIES
+
+    fingerprint = catalog_fingerprint()
+    manifest = read_manifest(snapshot_dir)
+    if manifest and manifest['fingerprint'] == fingerprint and not force:
+        # Still current: renew the check time so readers keep trusting it
+        write_pointer(snapshot_dir, read_pointer(snapshot_dir)[0])
+        return None
+
+    version = (manifest['version'] + 1) if manifest else 1
+    name = f"v{version:06d}"
+    snapshot_dir.mkdir(exist_ok=True)
+    staging = snapshot_dir / f".{name}.tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir()
+
+    row_counts = {}
+    for table_name, query in CATALOG_QUERIES.items():
+        table = pa.Table.from_pandas(execute_query(query), preserve_index=False)
+        write_table(table, staging / f"{table_name}.arrow")
+        row_counts[table_name] = table.num_rows
+
+    with open(staging / 'manifest.json', 'w') as f:
+        json.dump({
+            'version': version,
+            'built_at': datetime.now().isoformat(timespec='seconds'),
+            'fingerprint': fingerprint,
+            'rows': row_counts,
+        }, f, indent=2)
+
+    # Publish: the directory rename and the pointer replace are both atomic
+    os.replace(staging, snapshot_dir / name)
+    write_pointer(snapshot_dir, name)
+
+    prune_versions(snapshot_dir, keep=KEEP_VERSIONS)
+    return version
+
+def prune_versions(snapshot_dir=SNAPSHOT_DIR, keep=KEEP_VERSIONS):
+    """Delete old version directories, keeping the newest `keep`."""
+    versions = sorted(p for p in snapshot_dir.glob('v*') if p.is_dir())
+    for old in versions[:-keep]:
+        try:
+            shutil.rmtree(old)
+        except OSError:
+            # Still memory-mapped by a worker (Windows); retry on the next build
+            pass
+
+
+# ---------------------------------------------------------------
+# Reader (used by every worker)
+# ---------------------------------------------------------------
+
+class CatalogSnapshot:
+    """Memory-mapped view of one snapshot version."""
+
+    def __init__(self, version_dir):
+        self.version_dir = Path(version_dir)
+        with open(self.version_dir / 'manifest.json') as f:
+            self.manifest = json.load(f)
+        self.version = self.manifest['version']
+        self.tables = {}
+        self.frames = {}
+        for path in self.version_dir.glob('*.arrow'):
+            source = pa.memory_map(str(path), 'r')
+            # read_all() on a memory map references the mapped pages (zero-copy)
+            self.tables[path.stem] = pa.ipc.open_file(source).read_all()
+
+    def table(self, name):
+        return self.tables.get(name)
+
+    def frame(self, name):
+        """pandas view of a table, backed by the mapped Arrow buffers (ArrowDtype columns)."""
+        if name not in self.frames and name in self.tables:
+            self.frames[name] = self.tables[name].to_pandas(types_mapper=pd.ArrowDtype)
+        return self.frames.get(name)
+
+
+_current = None
+_stale_warned = None
+_lock = threading.Lock()
+
+def get_snapshot(snapshot_dir=SNAPSHOT_DIR, max_age=MAX_AGE_SECONDS):
+    """
+    Return the live CatalogSnapshot, swapping to a newer version if one was published.
+    Returns None when nothing is published or the last check is older than `max_age`.
+    """
+    global _current, _stale_warned
+    pointer = read_pointer(snapshot_dir)
+    if pointer is None:
+        return None
+    # Compare the version name, not the mtime: two publishes within the
+    # filesystem's timestamp granularity would otherwise look identical
+    name, checked_at = pointer
+    age = time.time() - checked_at
+    if age > max_age:
+        if _stale_warned != pointer:
+            _stale_warned = pointer
+            logger.warning("Catalog snapshot %s is %.0fs old (max %ds), reading from the database; "
+                           "is the catalog_snapshot.py --watch builder running?", name, age, max_age)
+        return None
+    if _current is not None and _current.version_dir.name == name:
+        return _current
+
+    with _lock:
+        if _current is None or _current.version_dir.name != name:
+            # Readers holding the old object keep using it; its maps close when released
+            _current = CatalogSnapshot(snapshot_dir / name)
+    return _current
+
+def load_table(name, snapshot_dir=SNAPSHOT_DIR):
+    """Get a catalog table (pyarrow.Table) from the live snapshot, or None."""
+    snapshot = get_snapshot(snapshot_dir)
+    return snapshot.table(name) if snapshot else None
+
+def load_frame(name, snapshot_dir=SNAPSHOT_DIR):
+    """Get a catalog table as a DataFrame cached for the live snapshot version, or None."""
+    snapshot = get_snapshot(snapshot_dir)
+    return snapshot.frame(name) if snapshot else None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the shared catalog snapshot")
+    parser.add_argument("--watch", type=int, metavar="SECONDS",
+                        help="Keep running and rebuild when the catalog changes")
+    parser.add_argument("--force", action="store_true",
+                        help="Build a new version even if nothing changed")
+    args = parser.parse_args()
+
+    while True:
+        version = build_snapshot(force=args.force)
+        if version:
+            print(f"Published catalog snapshot v{version} in {SNAPSHOT_DIR}")
+        else:
+            print("Catalog unchanged")
+        if not args.watch:
+            break
+        args.force = False
+        time.sleep(args.watch)
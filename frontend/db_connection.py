@@ -1,10 +1,13 @@
 # Database connection helper for Chinook Music Store
 # Uses pyodbc to connect to SQL Server
 
+import logging
 import pyodbc
 import pandas as pd
 from contextlib import contextmanager
 
+logger = logging.getLogger(__name__)
+
 # Connection configuration
 SERVER = r'AMD-PC\SQLEXPRESS'
 DATABASE = 'Chinook'
@@ -109,45 +112,103 @@ def test_connection():
 
 
 # Quick reference data functions
+# These lookups are served from the shared memory-mapped catalog snapshot
+# (see catalog_snapshot.py) when one has been built, otherwise from the database.
+CATALOG_QUERIES = {
+    'artists': "SELECT ArtistId, Name FROM Artist ORDER BY Name",
+    'albums': """
+        SELECT a.AlbumId, a.Title, ar.Name AS Artist, ar.ArtistId
+        FROM Album a
+        INNER JOIN Artist ar ON a.ArtistId = ar.ArtistId
+        ORDER BY a.Title
+    """,
+    'genres': "SELECT GenreId, Name FROM Genre ORDER BY Name",
+    'media_types': "SELECT MediaTypeId, Name FROM MediaType ORDER BY Name",
+    'customers': """
+        SELECT CustomerId, FirstName + ' ' + LastName AS Name, Email, Country
+        FROM Customer
+        ORDER BY LastName, FirstName
+    """,
+    'employees': """
+        SELECT EmployeeId, FirstName + ' ' + LastName AS Name, Title
+        FROM Employee
+        ORDER BY LastName, FirstName
+    """,
+    'tracks': """
+        SELECT t.TrackId, t.Name, a.Title AS Album, ar.Name AS Artist,
+               g.Name AS Genre, t.Milliseconds / 1000 AS Seconds, t.UnitPrice, t.GenreId
+        FROM Track t
+        INNER JOIN Album a ON t.AlbumId = a.AlbumId
+        INNER JOIN Artist ar ON a.ArtistId = ar.ArtistId
+        INNER JOIN Genre g ON t.GenreId = g.GenreId
+        ORDER BY t.Name
+    """,
+}
+
+def get_snapshot_table(name):
+    """Get a catalog table from the shared snapshot (pyarrow.Table), or None if unavailable."""
+    try:
+        from catalog_snapshot import load_table
+        return load_table(name)
+    except Exception:
+        logger.exception("Catalog snapshot unavailable for '%s', falling back to the database", name)
+        return None
+
+def get_catalog_lookup(name):
+    """
+    Get a catalog lookup as a DataFrame, from the snapshot if available.
+    The frame is converted once per snapshot version and shared - don't modify it.
+    """
+    try:
+        from catalog_snapshot import load_frame
+        frame = load_frame(name)
+        if frame is not None:
+            return frame
+    except Exception:
+        logger.exception("Catalog snapshot unavailable for '%s', falling back to the database", name)
+    return execute_query(CATALOG_QUERIES[name])
+
 def get_all_artists():
     """Get all artists for dropdowns."""
-    return execute_query("SELECT ArtistId, Name FROM Artist ORDER BY Name")
+    return get_catalog_lookup('artists')
 
 def get_all_albums():
     """Get all albums with artist names."""
-    return execute_query("""
-        SELECT a.AlbumId, a.Title, ar.Name AS Artist, ar.ArtistId
-        FROM Album a
-        INNER JOIN Artist ar ON a.ArtistId = ar.ArtistId
-        ORDER BY a.Title
-    """)
+    return get_catalog_lookup('albums')
 
 def get_all_genres():
     """Get all genres for dropdowns."""
-    return execute_query("SELECT GenreId, Name FROM Genre ORDER BY Name")
+    return get_catalog_lookup('genres')
 
 def get_all_media_types():
     """Get all media types."""
-    return execute_query("SELECT MediaTypeId, Name FROM MediaType ORDER BY Name")
+    return get_catalog_lookup('media_types')
 
 def get_all_customers():
     """Get all customers."""
-    return execute_query("""
-        SELECT CustomerId, FirstName + ' ' + LastName AS Name, Email, Country
-        FROM Customer
-        ORDER BY LastName, FirstName
-    """)
+    return get_catalog_lookup('customers')
 
 def get_all_employees():
     """Get all employees."""
-    return execute_query("""
-        SELECT EmployeeId, FirstName + ' ' + LastName AS Name, Title
-        FROM Employee
-        ORDER BY LastName, FirstName
-    """)
+    return get_catalog_lookup('employees')
 
 def get_tracks(search_term=None, genre_id=None, limit=100):
     """Get tracks with optional filters."""
+    table = get_snapshot_table('tracks')
+    if table is not None:
+        # Filter on the memory-mapped Arrow columns; only the result rows are copied
+        import pyarrow.compute as pc
+        if search_term:
+            mask = pc.or_(
+                pc.or_(pc.match_substring(table['Name'], search_term, ignore_case=True),
+                       pc.match_substring(table['Artist'], search_term, ignore_case=True)),
+                pc.match_substring(table['Album'], search_term, ignore_case=True)
+            )
+            table = table.filter(mask)
+        if genre_id:
+            table = table.filter(pc.equal(table['GenreId'], genre_id))
+        return table.slice(0, limit).drop_columns(['GenreId']).to_pandas()
+
     query = """
         SELECT TOP (?) t.TrackId, t.Name, a.Title AS Album, ar.Name AS Artist,
                g.Name AS Genre, t.Milliseconds / 1000 AS Seconds, t.UnitPrice
@@ -171,3 +232,38 @@ def get_tracks(search_term=None, genre_id=None, limit=100):
     query += " ORDER BY t.Name"
     
     return execute_query(query, params)
+
+
+# Log viewers (time-range queries)
+# The log tables are partitioned by month on their date column, so filtering on
+# that column lets SQL Server read only the partitions inside the range.
+def get_audit_logs(start, end, limit=500):
+    """Get DML audit log rows with ChangedAt in [start, end)."""
+    return execute_query("""
+        SELECT TOP (?) LogId, TableName, Operation, RecordId, OldValue, NewValue,
+               ChangedBy, FORMAT(ChangedAt, 'yyyy-MM-dd HH:mm:ss') AS ChangedAt
+        FROM AuditLog
+        WHERE ChangedAt >= ? AND ChangedAt < ?
+        ORDER BY AuditLog.ChangedAt DESC, LogId DESC
+    """, [limit, start, end])
+
+def get_schema_change_logs(start, end, limit=500):
+    """Get DDL schema change log rows with EventDate in [start, end)."""
+    return execute_query("""
+        SELECT TOP (?) LogId, EventType, ObjectName, LoginName,
+               FORMAT(EventDate, 'yyyy-MM-dd HH:mm:ss') AS EventDate,
+               LEFT(SQLCommand, 100) AS SQLCommand
+        FROM SchemaChangeLog
+        WHERE EventDate >= ? AND EventDate < ?
+        ORDER BY SchemaChangeLog.EventDate DESC, LogId DESC
+    """, [limit, start, end])
+
+def get_blocked_action_logs(start, end, limit=500):
+    """Get blocked action log rows with AttemptedAt in [start, end)."""
+    return execute_query("""
+        SELECT TOP (?) LogId, TableName, AttemptedAction, RecordId, AttemptedBy,
+               FORMAT(AttemptedAt, 'yyyy-MM-dd HH:mm:ss') AS AttemptedAt, Reason
+        FROM BlockedActionLog
+        WHERE AttemptedAt >= ? AND AttemptedAt < ?
+        ORDER BY BlockedActionLog.AttemptedAt DESC, LogId DESC
+    """, [limit, start, end])
@@ -0,0 +1,83 @@
+"""
+Log retention & archival for Chinook Music Store
+Switches monthly log partitions older than the retention period out of
+AuditLog, SchemaChangeLog and BlockedActionLog, writes them to gzip-compressed
+CSV files and rolls the partition window forward.
+
+Usage:
+    python log_archive.py            # Run once (schedule daily/monthly)
+"""
+
+from datetime import date
+from pathlib import Path
+
+from db_connection import execute_query, execute_non_query, execute_procedure
+
+# Retention configuration (months of logs kept online per table)
+LOG_RETENTION_MONTHS = {
+    'AuditLog': 12,
+    'SchemaChangeLog': 24,
+    'BlockedActionLog': 6,
+}
+LOG_DATE_COLUMNS = {
+    'AuditLog': 'ChangedAt',
+    'SchemaChangeLog': 'EventDate',
+    'BlockedActionLog': 'AttemptedAt',
+}
+ARCHIVE_DIR = Path(__file__).parent / 'archive'
+
+def retention_cutoff(months, today=None):
+    """First day of the month `months` before the current month."""
+    today = today or date.today()
+    index = today.year * 12 + (today.month - 1) - months
+    return date(index // 12, index % 12 + 1, 1)
+
+def export_archive_table(table_name):
+    """Write <table>_Archive to a compressed file and truncate it. Returns rows exported."""
+    date_col = LOG_DATE_COLUMNS[table_name]
+    rows = execute_query(f"SELECT * FROM {table_name}_Archive ORDER BY {date_col}, LogId")
+    if rows.empty:
+        return 0
+
+    ARCHIVE_DIR.mkdir(exist_ok=True)
+    month = rows[date_col].min().strftime('%Y-%m')
+    path = ARCHIVE_DIR / f"{table_name}_{month}.csv.gz"
+    suffix = 1
+    while path.exists():
+        path = ARCHIVE_DIR / f"{table_name}_{month}_{suffix}.csv.gz"
+        suffix += 1
+    rows.to_csv(path, index=False, compression='gzip')
+
+    # Only truncate once the file is safely written
+    execute_non_query(f"TRUNCATE TABLE {table_name}_Archive")
+    print(f"  {table_name}: archived {len(rows)} rows -> {path.name}")
+    return len(rows)
+
+def archive_table(table_name, retention_months):
+    """Switch out and export every partition of a log table older than the retention period."""
+    cutoff = retention_cutoff(retention_months)
+
+    # A previous run may have stopped between SWITCH and export
+    total = export_archive_table(table_name)
+
+    while True:
+        result = execute_procedure("sp_SwitchOutLogPartition", [table_name, cutoff])
+        if result is None or result.empty or int(result.iloc[0]['RowsSwitched']) == 0:
+            break
+        total += export_archive_table(table_name)
+    return total
+
+def archive_old_logs(retention=None):
+    """Apply the retention policy to all log tables and roll the partition window."""
+    retention = retention or LOG_RETENTION_MONTHS
+    results = {}
+    for table_name, months in retention.items():
+        results[table_name] = archive_table(table_name, months)
+    execute_procedure("sp_MaintainLogPartitions", fetch_results=False)
+    return results
+
+
+if __name__ == "__main__":
+    print(f"Archiving logs to {ARCHIVE_DIR}")
+    archived = archive_old_logs()
+    print(f"Done. Rows archived: {sum(archived.values())}")
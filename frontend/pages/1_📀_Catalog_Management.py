@@ -5,9 +5,13 @@ Demonstrates: DML Triggers, DDL Triggers, INSTEAD OF Triggers, Stored Procedures
 
 import streamlit as st
 import sys
+from datetime import date, timedelta
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
-from db_connection import execute_query, execute_procedure_with_output, execute_non_query
+from db_connection import (
+    execute_query, execute_procedure_with_output, execute_non_query,
+    get_audit_logs, get_schema_change_logs, get_blocked_action_logs
+)
 
 st.set_page_config(page_title="Catalog Management", page_icon="📀", layout="wide")
 
@@ -22,6 +26,17 @@ st.markdown("# 📀 Catalog Management")
 st.markdown("**Key Concepts:** DML Triggers, DDL Triggers, INSTEAD OF Triggers")
 st.markdown("---")
 
+def log_date_range(key):
+    """Date range picker for the log tabs. Returns (start, end) with end exclusive."""
+    today = date.today()
+    selected = st.date_input("Date range", value=(today - timedelta(days=30), today), key=key)
+    if isinstance(selected, (tuple, list)):
+        start = selected[0]
+        end = selected[1] if len(selected) > 1 else selected[0]
+    else:
+        start = end = selected
+    return start, end + timedelta(days=1)
+
 tab1, tab2, tab3, tab4, tab5 = st.tabs([
     "➕ Add Artist", "💰 Update Price", "📋 DML Audit Log", "🔧 DDL Schema Log", "🚫 Blocked Actions"
 ])
@@ -79,19 +94,16 @@ with tab3:
     st.markdown("### 📋 DML Audit Log")
     st.markdown("**Trigger:** `trg_Track_Audit` logs INSERT/UPDATE/DELETE on Track table")
     
+    start, end = log_date_range("range_dml")
     if st.button("🔄 Refresh", key="refresh_dml"):
         st.rerun()
     
     try:
-        logs = execute_query("""
-            SELECT LogId, TableName, Operation, RecordId, OldValue, NewValue, 
-                   ChangedBy, FORMAT(ChangedAt, 'yyyy-MM-dd HH:mm:ss') AS ChangedAt
-            FROM AuditLog ORDER BY LogId DESC
-        """)
+        logs = get_audit_logs(start, end)
         if not logs.empty:
             st.dataframe(logs, use_container_width=True, height=350)
         else:
-            st.info("No audit logs yet. Add or update something!")
+            st.info("No audit logs in this range. Add or update something!")
     except Exception as e:
         st.error(f"Error: {e}")
         st.info("Run complete_setup.sql first.")
@@ -100,20 +112,16 @@ with tab4:
     st.markdown("### 🔧 DDL Schema Change Log")
     st.markdown("**Trigger:** `trg_DDL_SchemaChanges` logs CREATE/ALTER/DROP on tables and procedures")
     
+    start, end = log_date_range("range_ddl")
     if st.button("🔄 Refresh", key="refresh_ddl"):
         st.rerun()
     
     try:
-        schema_logs = execute_query("""
-            SELECT LogId, EventType, ObjectName, LoginName,
-                   FORMAT(EventDate, 'yyyy-MM-dd HH:mm:ss') AS EventDate,
-                   LEFT(SQLCommand, 100) AS SQLCommand
-            FROM SchemaChangeLog ORDER BY LogId DESC
-        """)
+        schema_logs = get_schema_change_logs(start, end)
         if not schema_logs.empty:
             st.dataframe(schema_logs, use_container_width=True, height=350)
         else:
-            st.info("No schema changes logged yet. Try creating a table in SSMS!")
+            st.info("No schema changes logged in this range. Try creating a table in SSMS!")
     except Exception as e:
         st.error(f"Error: {e}")
     
@@ -125,19 +133,16 @@ with tab5:
     st.markdown("### 🚫 Blocked Action Log")
     st.markdown("**Trigger:** `trg_Artist_BlockDelete` (INSTEAD OF) blocks unauthorized deletes")
     
+    start, end = log_date_range("range_blocked")
     if st.button("🔄 Refresh", key="refresh_blocked"):
         st.rerun()
     
     try:
-        blocked_logs = execute_query("""
-            SELECT LogId, TableName, AttemptedAction, RecordId, AttemptedBy,
-                   FORMAT(AttemptedAt, 'yyyy-MM-dd HH:mm:ss') AS AttemptedAt, Reason
-            FROM BlockedActionLog ORDER BY LogId DESC
-        """)
+        blocked_logs = get_blocked_action_logs(start, end)
         if not blocked_logs.empty:
             st.dataframe(blocked_logs, use_container_width=True, height=350)
         else:
-            st.info("No blocked actions yet. Try deleting an artist via the view!")
+            st.info("No blocked actions in this range. Try deleting an artist via the view!")
     except Exception as e:
         st.error(f"Error: {e}")
     
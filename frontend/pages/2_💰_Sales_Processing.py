@@ -7,7 +7,7 @@ import streamlit as st
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
-from db_connection import execute_query, execute_procedure_with_output
+from db_connection import execute_query, execute_procedure_with_output, get_all_customers, get_tracks
 
 st.set_page_config(page_title="Sales Processing", page_icon="💰", layout="wide")
 
@@ -19,7 +19,7 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 st.markdown("# 💰 Sales Processing")
-st.markdown("**Key Concept:** SERIALIZABLE transactions ensure ACID properties")
+st.markdown("**Key Concepts:** SERIALIZABLE transactions ensure ACID properties | SNAPSHOT isolation for optimistic checkout")
 st.markdown("---")
 
 # Initialize cart
@@ -33,17 +33,10 @@ with col1:
     search = st.text_input("🔍 Search", placeholder="Track name, artist...")
     
     try:
-        query = """
-            SELECT TOP 30 t.TrackId, t.Name AS Track, ar.Name AS Artist, t.UnitPrice AS Price
-            FROM Track t
-            JOIN Album a ON t.AlbumId = a.AlbumId
-            JOIN Artist ar ON a.ArtistId = ar.ArtistId
-        """
-        if search:
-            query += f" WHERE t.Name LIKE '%{search}%' OR ar.Name LIKE '%{search}%'"
-        query += " ORDER BY t.Name"
-        
-        tracks = execute_query(query)
+        # Served from the shared catalog snapshot when one is live
+        tracks = get_tracks(search_term=search or None, limit=30)
+        tracks = tracks[['TrackId', 'Name', 'Artist', 'UnitPrice']].rename(
+            columns={'Name': 'Track', 'UnitPrice': 'Price'})
         if not tracks.empty:
             st.dataframe(tracks, use_container_width=True, height=300)
             
@@ -79,21 +72,34 @@ with col2:
         st.markdown("### Checkout")
         
         try:
-            customers = execute_query("SELECT CustomerId, FirstName + ' ' + LastName AS Name FROM Customer ORDER BY LastName")
+            customers = get_all_customers()
             customer_map = {row['Name']: row['CustomerId'] for _, row in customers.iterrows()}
             selected = st.selectbox("Customer", list(customer_map.keys()))
+            mode = st.radio("Checkout mode", ["SERIALIZABLE (locking)", "SNAPSHOT (optimistic)"])
             
             if st.button("💳 Complete Purchase", type="primary"):
                 track_ids = ','.join(str(i['id']) for i in st.session_state.cart)
                 try:
-                    invoice_id = execute_procedure_with_output(
-                        "sp_CompletePurchase",
-                        {"CustomerId": customer_map[selected], "TrackIds": track_ids},
-                        "InvoiceId"
-                    )
+                    if mode.startswith("SNAPSHOT"):
+                        # Each line's price is re-checked against the cart; conflicts are retried
+                        cart = ','.join(f"{i['id']}:{i['price']:.2f}" for i in st.session_state.cart)
+                        invoice_id = execute_procedure_with_output(
+                            "sp_CompletePurchaseOptimistic",
+                            {"CustomerId": customer_map[selected], "Cart": cart},
+                            "InvoiceId"
+                        )
+                    else:
+                        invoice_id = execute_procedure_with_output(
+                            "sp_CompletePurchase",
+                            {"CustomerId": customer_map[selected], "TrackIds": track_ids},
+                            "InvoiceId"
+                        )
                     st.success(f"✅ Purchase complete! Invoice #{invoice_id}")
                     st.balloons()
-                    st.info("💡 Used SERIALIZABLE isolation - highest level!")
+                    if mode.startswith("SNAPSHOT"):
+                        st.info("💡 Used SNAPSHOT isolation - row versioning, no range locks!")
+                    else:
+                        st.info("💡 Used SERIALIZABLE isolation - highest level!")
                     st.session_state.cart = []
                 except Exception as e:
                     st.error(f"❌ Transaction rolled back: {e}")
@@ -5,9 +5,14 @@ Demonstrates: Concurrency Control (UPDLOCK), Deadlock Handling (TRY-CATCH retry)
 
 import streamlit as st
 import sys
+import pandas as pd
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
-from db_connection import execute_query, execute_procedure, execute_procedure_with_output, execute_non_query
+from db_connection import (
+    execute_query, execute_procedure, execute_procedure_with_output, execute_non_query,
+    get_all_customers, get_all_employees
+)
+from ticket_ingest import create_ticket, ingest_tickets
 
 st.set_page_config(page_title="Customer Support", page_icon="🎫", layout="wide")
 
@@ -53,7 +58,7 @@ with tab1:
     with st.form("create_ticket"):
         col1, col2 = st.columns(2)
         try:
-            customers = execute_query("SELECT CustomerId, FirstName + ' ' + LastName AS Name FROM Customer")
+            customers = get_all_customers()
             cust_map = {row['Name']: row['CustomerId'] for _, row in customers.iterrows()}
             customer = col1.selectbox("Customer", list(cust_map.keys()))
         except:
@@ -64,12 +69,27 @@ with tab1:
         
         if st.form_submit_button("Create Ticket") and subject:
             try:
-                # Insert with explicit Status (table has DEFAULT but better to be explicit)
+                # Single round trip: the new id comes back via OUTPUT inserted.TicketId
                 cust_id = cust_map.get(customer, 1)
-                execute_non_query(f"INSERT INTO SupportTicket (CustomerId, Subject, Status) VALUES ({cust_id}, N'{subject}', 'Open')")
-                result = execute_query("SELECT MAX(TicketId) AS TicketId FROM SupportTicket")
-                ticket_id = result.iloc[0]['TicketId']
-                st.success(f"✅ Ticket #{ticket_id} created!")
+                ticket_id = create_ticket(cust_id, subject)
+                if ticket_id is None:
+                    st.error(f"❌ Customer #{cust_id} not found - ticket not created.")
+                else:
+                    st.success(f"✅ Ticket #{ticket_id} created!")
+            except Exception as e:
+                st.error(f"Error: {e}")
+    
+    with st.expander("📥 Bulk Import (CSV)"):
+        st.markdown("Columns: `CustomerId`, `Subject`, `ExternalRef`. Tickets with an existing `ExternalRef` are skipped.")
+        uploaded = st.file_uploader("Tickets file", type="csv")
+        if uploaded is not None and st.button("Import Tickets"):
+            try:
+                df = pd.read_csv(uploaded, dtype={'ExternalRef': str})
+                df = df.astype(object).where(df.notna(), None)
+                summary = ingest_tickets(df.to_dict('records'))
+                st.success(f"✅ {summary['created']} created, {summary['duplicates']} duplicates, "
+                           f"{summary['rejected']} rejected ({summary['rows_per_sec']:.0f} rows/sec)")
+                st.dataframe(pd.DataFrame(summary['batches']), use_container_width=True)
             except Exception as e:
                 st.error(f"Error: {e}")
 
@@ -83,7 +103,7 @@ with tab2:
         with st.form("claim"):
             ticket_id = st.number_input("Ticket ID", min_value=1, step=1, key="claim_id")
             try:
-                employees = execute_query("SELECT EmployeeId, FirstName + ' ' + LastName AS Name FROM Employee")
+                employees = get_all_employees()
                 emp_map = {row['Name']: row['EmployeeId'] for _, row in employees.iterrows()}
                 employee = st.selectbox("Your Name", list(emp_map.keys()))
             except:
@@ -0,0 +1,131 @@
+"""
+Module 4: Playlists
+Demonstrates: In-memory bitmap index, incremental refresh via change-tracking trigger
+"""
+
+import streamlit as st
+import sys
+import time
+import pandas as pd
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))
+from db_connection import get_all_genres, get_all_artists
+from playlist_engine import get_playlist_index, save_playlist, bitmap_count
+
+st.set_page_config(page_title="Playlists", page_icon="🎶", layout="wide")
+
+st.markdown("""
+<style>
+    .stApp { background: linear-gradient(135deg, #1a1a2e 0%, #16213e 100%); }
+    h1, h2, h3 { color: #e94560 !important; }
+</style>
+""", unsafe_allow_html=True)
+
+st.markdown("# 🎶 Playlists")
+st.markdown("**Key Concepts:** Bitmap membership index | Incremental refresh (`trg_PlaylistTrack_Changes`)")
+st.markdown("---")
+
+TRACK_COLUMNS = ['TrackId', 'Name', 'Artist', 'Genre', 'Seconds']
+
+try:
+    index = get_playlist_index()
+except Exception as e:
+    st.error(f"Error: {e}")
+    st.info("Run complete_setup.sql first.")
+    st.stop()
+
+playlist_map = {f"{name} (#{pid})": pid for pid, name in sorted(index.playlists.items())}
+
+tab1, tab2, tab3 = st.tabs(["🔍 Track Lookup", "➗ Set Operations", "✨ Generate"])
+
+with tab1:
+    st.markdown("### Which playlists contain this track?")
+    track_id = st.number_input("Track ID", min_value=1, step=1)
+
+    start = time.perf_counter()
+    found = index.playlists_containing(int(track_id))
+    elapsed_us = (time.perf_counter() - start) * 1_000_000
+
+    if found:
+        st.dataframe(
+            pd.DataFrame([(p, index.playlists.get(p), index.playlist_size(p)) for p in found],
+                         columns=['PlaylistId', 'Name', 'Tracks']),
+            use_container_width=True
+        )
+    else:
+        st.info("Track is not in any playlist.")
+    st.caption(f"⚡ Lookup took {elapsed_us:.1f} µs (bitmap index, no JOIN)")
+
+with tab2:
+    st.markdown("### Combine Playlists")
+    col1, col2 = st.columns(2)
+    first = col1.multiselect("Playlists (A)", list(playlist_map.keys()))
+    operation = col2.radio("Operation", ["Union (A₁ ∪ A₂ ...)", "Intersect (A₁ ∩ A₂ ...)", "Difference (A − B)"])
+    second = []
+    if operation.startswith("Difference"):
+        second = col2.multiselect("Remove tracks in (B)", list(playlist_map.keys()))
+
+    if first:
+        ids_a = [playlist_map[p] for p in first]
+        start = time.perf_counter()
+        if operation.startswith("Union"):
+            result = index.union(*ids_a)
+        elif operation.startswith("Intersect"):
+            result = index.intersect(*ids_a)
+        else:
+            result = index.union(*ids_a) & ~index.union(*[playlist_map[p] for p in second])
+        elapsed_us = (time.perf_counter() - start) * 1_000_000
+
+        st.markdown(f"**{bitmap_count(result)} tracks** — computed in {elapsed_us:.1f} µs")
+        st.dataframe(pd.DataFrame(index.describe(result), columns=TRACK_COLUMNS),
+                     use_container_width=True, height=300)
+
+with tab3:
+    st.markdown("### Generate a Playlist")
+    try:
+        genres = get_all_genres()
+        artists = get_all_artists()
+        genre_map = {row['Name']: row['GenreId'] for _, row in genres.iterrows()}
+        artist_map = {row['Name']: row['ArtistId'] for _, row in artists.iterrows()}
+    except Exception as e:
+        st.error(f"Error: {e}")
+        genre_map, artist_map = {}, {}
+
+    with st.form("generate"):
+        col1, col2 = st.columns(2)
+        sel_genres = col1.multiselect("Genres", list(genre_map.keys()))
+        sel_artists = col2.multiselect("Artists", list(artist_map.keys()))
+        col1, col2, col3 = st.columns(3)
+        min_seconds = col1.number_input("Min track length (s)", min_value=0, value=0, step=30)
+        max_seconds = col2.number_input("Max track length (s)", min_value=0, value=0, step=30,
+                                        help="0 = no limit")
+        max_minutes = col3.number_input("Total length (min)", min_value=0, value=60, step=10,
+                                        help="0 = no limit")
+        generated = st.form_submit_button("Generate", type="primary")
+
+    if generated:
+        st.session_state.generated_tracks = index.generate(
+            genre_ids=[int(genre_map[g]) for g in sel_genres],
+            artist_ids=[int(artist_map[a]) for a in sel_artists],
+            min_seconds=min_seconds or None,
+            max_seconds=max_seconds or None,
+            max_minutes=max_minutes or None,
+        )
+
+    track_ids = st.session_state.get('generated_tracks', [])
+    if track_ids:
+        rows = index.describe(track_ids)
+        total_minutes = sum(r[4] for r in rows) / 60
+        st.markdown(f"**{len(rows)} tracks, {total_minutes:.0f} minutes**")
+        st.dataframe(pd.DataFrame(rows, columns=TRACK_COLUMNS), use_container_width=True, height=300)
+
+        with st.form("save_playlist"):
+            name = st.text_input("Playlist name")
+            if st.form_submit_button("💾 Save Playlist") and name:
+                try:
+                    playlist_id = save_playlist(name, track_ids)
+                    index.refresh(force=True)
+                    st.success(f"✅ Playlist #{playlist_id} saved ({index.playlist_size(playlist_id)} tracks indexed)")
+                    st.session_state.generated_tracks = []
+                except Exception as e:
+                    st.error(f"Error: {e}")
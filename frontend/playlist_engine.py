@@ -0,0 +1,349 @@
+"""
+Playlist engine for Chinook Music Store
+Keeps an in-memory bitmap index over PlaylistTrack: each playlist is a Python
+int whose bit N is set when TrackId N is in the playlist. Membership checks
+and set algebra (union, intersect, diff) become single integer operations
+instead of joins. The index is loaded once and then refreshed incrementally
+from PlaylistTrackChangeLog (written by trg_PlaylistTrack_Changes), paging by
+RowVer up to MIN_ACTIVE_ROWVERSION(). Each process records the position it has
+applied in PlaylistIndexWatermark so sp_PrunePlaylistChangeLog can delete the
+change log below the slowest reader.
+"""
+
+import os
+import random
+import socket
+import threading
+import time
+from bisect import bisect_left, bisect_right
+
+import pandas as pd
+
+from db_connection import execute_query, execute_procedure, get_connection
+
+# Refresh throttling (seconds); the page calls get_playlist_index() on every rerun
+REFRESH_INTERVAL_SECONDS = 5        # change log + playlist names
+TRACK_CHECK_INTERVAL_SECONDS = 300  # Track fingerprint (CHECKSUM_AGG scan)
+PRUNE_INTERVAL_SECONDS = 600        # sp_PrunePlaylistChangeLog
+STALE_MINUTES = 60                  # watermarks not refreshed for this long are dropped
+
+
+# ---------------------------------------------------------------
+# Bitmap helpers
+# ---------------------------------------------------------------
+
+def ids_to_bitmap(ids):
+    """Build a bitmap from an iterable of integer ids."""
+    bitmap = 0
+    for i in ids:
+        bitmap |= 1 << int(i)
+    return bitmap
+
+def bitmap_to_ids(bitmap):
+    """Sorted list of the ids set in a bitmap."""
+    bits = bin(bitmap)[:1:-1]  # least significant bit first, '0b' prefix dropped
+    return [i for i, bit in enumerate(bits) if bit == '1']
+
+def bitmap_count(bitmap):
+    """Number of ids set in a bitmap."""
+    return bin(bitmap).count('1')
+
+def ids_to_bitmap_union(bitmaps, keys):
+    """OR the bitmaps stored under `keys`."""
+    result = 0
+    for k in keys:
+        result |= bitmaps.get(k, 0)
+    return result
+
+
+# ---------------------------------------------------------------
+# Index
+# ---------------------------------------------------------------
+
+class PlaylistIndex:
+    """Bitmap membership index over Playlist / PlaylistTrack plus track attributes."""
+
+    def __init__(self):
+        self.playlists = {}         # PlaylistId -> Name
+        self.members = {}           # PlaylistId -> bitmap of TrackIds
+        self.track_playlists = {}   # TrackId -> bitmap of PlaylistIds
+        self.watermark = None       # CAST(RowVer AS BIGINT): changes below it are applied
+        # Track attributes for generating playlists
+        self.tracks = {}            # TrackId -> (Name, Artist, Genre, Milliseconds)
+        self.all_tracks = 0
+        self.by_genre = {}          # GenreId -> bitmap of TrackIds
+        self.by_artist = {}         # ArtistId -> bitmap of TrackIds
+        self.durations = []         # sorted (Milliseconds, TrackId)
+        self.track_fingerprint = None
+        self.process_id = f"{socket.gethostname()}:{os.getpid()}:{id(self):x}"[:100]
+        self._last_refresh = 0.0
+        self._last_track_check = None
+        self._last_prune = time.monotonic()
+        self._lock = threading.Lock()
+
+    # --- Loading ---------------------------------------------------
+
+    def refresh(self, full=False, force=False):
+        """
+        Bring the index up to date. Returns the number of changes applied
+        (-1 = full load, 0 when skipped because the last refresh is recent).
+        Calls within REFRESH_INTERVAL_SECONDS are skipped unless `force` is set.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if (not full and not force and self.watermark is not None
+                    and now - self._last_refresh < REFRESH_INTERVAL_SECONDS):
+                return 0
+
+            if full or self._last_track_check is None or now - self._last_track_check >= TRACK_CHECK_INTERVAL_SECONDS:
+                self._refresh_tracks()
+                self._last_track_check = now
+
+            applied = None
+            if not full and self.watermark is not None:
+                applied = self._apply_changes()
+            if applied is None:
+                self._load_memberships()
+                applied = -1
+            self._last_refresh = now
+
+            if now - self._last_prune >= PRUNE_INTERVAL_SECONDS:
+                execute_procedure("sp_PrunePlaylistChangeLog", [STALE_MINUTES])
+                self._last_prune = now
+            return applied
+
+    def _refresh_tracks(self):
+        """Reload track attributes only when the Track table changed."""
+        fp = execute_query("""
+            SELECT COUNT_BIG(*) AS TrackCount,
+                   CHECKSUM_AGG(BINARY_CHECKSUM(TrackId, AlbumId, GenreId, Milliseconds, Name)) AS Checksum
+            FROM Track
+        """)
+        fingerprint = (int(fp.iloc[0]['TrackCount']), int(fp.iloc[0]['Checksum'] or 0))
+        if fingerprint == self.track_fingerprint:
+            return
+
+        df = execute_query("""
+            SELECT t.TrackId, t.Name, ar.ArtistId, ar.Name AS Artist,
+                   t.GenreId, g.Name AS Genre, t.Milliseconds
+            FROM Track t
+            INNER JOIN Album a ON t.AlbumId = a.AlbumId
+            INNER JOIN Artist ar ON a.ArtistId = ar.ArtistId
+            LEFT JOIN Genre g ON t.GenreId = g.GenreId
+        """)
+        tracks, by_genre, by_artist, durations = {}, {}, {}, []
+        for r in df.itertuples():
+            track_id = int(r.TrackId)
+            bit = 1 << track_id
+            tracks[track_id] = (r.Name, r.Artist, r.Genre, int(r.Milliseconds))
+            if pd.notna(r.GenreId):
+                by_genre[int(r.GenreId)] = by_genre.get(int(r.GenreId), 0) | bit
+            by_artist[int(r.ArtistId)] = by_artist.get(int(r.ArtistId), 0) | bit
+            durations.append((int(r.Milliseconds), track_id))
+        durations.sort()
+
+        self.tracks = tracks
+        self.all_tracks = ids_to_bitmap(tracks)
+        self.by_genre = by_genre
+        self.by_artist = by_artist
+        self.durations = durations
+        self.track_fingerprint = fingerprint
+
+    def _load_memberships(self):
+        """Full load of Playlist / PlaylistTrack into bitmaps, in one round trip."""
+        # The bound is taken in its own statement before the load, so every change
+        # below it is already in the loaded rows. Changes at or above it may be too;
+        # replaying them on the next refresh is safe because set/clear bit is idempotent.
+        # Registering the watermark in the same transaction keeps the change log from
+        # being pruned above it (sp_PrunePlaylistChangeLog waits on the row lock).
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SET NOCOUNT ON;
+                DECLARE @Bound BIGINT = CAST(MIN_ACTIVE_ROWVERSION() AS BIGINT);
+                
+                UPDATE PlaylistIndexWatermark SET Watermark = @Bound, UpdatedAt = GETDATE()
+                WHERE ProcessId = ?;
+                IF @@ROWCOUNT = 0
+                    INSERT INTO PlaylistIndexWatermark (ProcessId, Watermark) VALUES (?, @Bound);
+                
+                SELECT @Bound AS Bound;
+                SELECT PlaylistId, TrackId FROM PlaylistTrack;
+                SELECT PlaylistId, Name FROM Playlist;
+            """, [self.process_id, self.process_id])
+            bound = cursor.fetchone()[0]
+            cursor.nextset()
+            rows = cursor.fetchall()
+            cursor.nextset()
+            names = cursor.fetchall()
+            conn.commit()
+
+        members, track_playlists = {}, {}
+        for playlist_id, track_id in rows:
+            members[playlist_id] = members.get(playlist_id, 0) | (1 << track_id)
+            track_playlists[track_id] = track_playlists.get(track_id, 0) | (1 << playlist_id)
+
+        self.members = members
+        self.track_playlists = track_playlists
+        self.playlists = {playlist_id: name for playlist_id, name in names}
+        self.watermark = int(bound)
+
+    def _apply_changes(self):
+        """
+        Apply PlaylistTrackChangeLog rows committed since the last refresh, in one
+        round trip. Returns the number applied, or None when this process's
+        watermark was pruned as stale and a full load is needed.
+        """
+        # RowVer below MIN_ACTIVE_ROWVERSION() is final: no open transaction can
+        # still commit a change there, so advancing to the bound never skips one.
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SET NOCOUNT ON;
+                UPDATE PlaylistIndexWatermark SET Watermark = ?, UpdatedAt = GETDATE()
+                WHERE ProcessId = ?;
+                SELECT @@ROWCOUNT AS Registered;
+                
+                DECLARE @Bound BINARY(8) = MIN_ACTIVE_ROWVERSION();
+                SELECT CAST(@Bound AS BIGINT) AS Bound;
+                SELECT PlaylistId, TrackId, Operation
+                FROM PlaylistTrackChangeLog
+                WHERE RowVer >= CAST(CAST(? AS BIGINT) AS BINARY(8)) AND RowVer < @Bound
+                ORDER BY RowVer;
+                SELECT PlaylistId, Name FROM Playlist;
+            """, [self.watermark, self.process_id, self.watermark])
+            registered = cursor.fetchone()[0]
+            cursor.nextset()
+            bound = cursor.fetchone()[0]
+            cursor.nextset()
+            changes = cursor.fetchall()
+            cursor.nextset()
+            names = cursor.fetchall()
+            conn.commit()
+
+        if not registered:
+            return None
+
+        for playlist_id, track_id, operation in changes:
+            track_bit, playlist_bit = 1 << track_id, 1 << playlist_id
+            if operation == 'I':
+                self.members[playlist_id] = self.members.get(playlist_id, 0) | track_bit
+                self.track_playlists[track_id] = self.track_playlists.get(track_id, 0) | playlist_bit
+            else:
+                self.members[playlist_id] = self.members.get(playlist_id, 0) & ~track_bit
+                self.track_playlists[track_id] = self.track_playlists.get(track_id, 0) & ~playlist_bit
+        self.playlists = {playlist_id: name for playlist_id, name in names}
+        self.watermark = int(bound)
+        return len(changes)
+
+    # --- Membership ------------------------------------------------
+
+    def contains(self, playlist_id, track_id):
+        """Is the track in the playlist?"""
+        return bool(self.members.get(playlist_id, 0) >> track_id & 1)
+
+    def playlists_containing(self, track_id):
+        """PlaylistIds that contain the track."""
+        return bitmap_to_ids(self.track_playlists.get(track_id, 0))
+
+    def playlist_tracks(self, playlist_id):
+        """Sorted TrackIds of a playlist."""
+        return bitmap_to_ids(self.members.get(playlist_id, 0))
+
+    def playlist_size(self, playlist_id):
+        return bitmap_count(self.members.get(playlist_id, 0))
+
+    # --- Set algebra (playlist ids in, bitmap out) -----------------
+
+    def union(self, *playlist_ids):
+        result = 0
+        for p in playlist_ids:
+            result |= self.members.get(p, 0)
+        return result
+
+    def intersect(self, *playlist_ids):
+        if not playlist_ids:
+            return 0
+        result = self.members.get(playlist_ids[0], 0)
+        for p in playlist_ids[1:]:
+            result &= self.members.get(p, 0)
+        return result
+
+    def difference(self, playlist_id, *others):
+        """Tracks in `playlist_id` that are in none of `others`."""
+        return self.members.get(playlist_id, 0) & ~self.union(*others)
+
+    # --- Generation ------------------------------------------------
+
+    def duration_range(self, min_seconds=None, max_seconds=None):
+        """Bitmap of tracks whose length is within [min_seconds, max_seconds]."""
+        lo = bisect_left(self.durations, (min_seconds * 1000, -1)) if min_seconds else 0
+        hi = bisect_right(self.durations, (max_seconds * 1000, float('inf'))) if max_seconds else len(self.durations)
+        return ids_to_bitmap(track_id for _, track_id in self.durations[lo:hi])
+
+    def generate(self, genre_ids=None, artist_ids=None, min_seconds=None, max_seconds=None,
+                 max_minutes=None, exclude_playlist_id=None, shuffle=True, seed=None):
+        """
+        Pick TrackIds matching all given filters.
+        Genres (and artists) within one filter are OR-ed; filters are AND-ed.
+        Stops once the total length reaches `max_minutes`.
+        """
+        candidates = self.all_tracks
+        if genre_ids:
+            candidates &= ids_to_bitmap_union(self.by_genre, genre_ids)
+        if artist_ids:
+            candidates &= ids_to_bitmap_union(self.by_artist, artist_ids)
+        if min_seconds or max_seconds:
+            candidates &= self.duration_range(min_seconds, max_seconds)
+        if exclude_playlist_id is not None:
+            candidates &= ~self.members.get(exclude_playlist_id, 0)
+
+        track_ids = bitmap_to_ids(candidates)
+        if shuffle:
+            random.Random(seed).shuffle(track_ids)
+        if max_minutes is None:
+            return track_ids
+
+        budget, picked = max_minutes * 60 * 1000, []
+        for track_id in track_ids:
+            length = self.tracks[track_id][3]
+            if length <= budget:
+                picked.append(track_id)
+                budget -= length
+        return picked
+
+    def describe(self, bitmap_or_ids):
+        """Rows (TrackId, Name, Artist, Genre, Seconds) for display."""
+        ids = bitmap_to_ids(bitmap_or_ids) if isinstance(bitmap_or_ids, int) else bitmap_or_ids
+        return [
+            (i, *self.tracks[i][:3], self.tracks[i][3] // 1000)
+            for i in ids if i in self.tracks
+        ]
+
+
+def save_playlist(name, track_ids):
+    """Create a playlist with sp_CreatePlaylist and return its PlaylistId."""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SET NOCOUNT ON;
+            DECLARE @out INT;
+            EXEC sp_CreatePlaylist @Name = ?, @TrackIds = ?, @PlaylistId = @out OUTPUT;
+            SELECT @out;
+        """, [name, ','.join(str(i) for i in track_ids)])
+        playlist_id = cursor.fetchone()[0]
+        conn.commit()
+        return playlist_id
+
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_playlist_index():
+    """Process-wide PlaylistIndex, refreshed incrementally (at most every REFRESH_INTERVAL_SECONDS)."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = PlaylistIndex()
+    _index.refresh()
+    return _index
@@ -0,0 +1,178 @@
+"""
+Bulk support ticket ingestion for Chinook Music Store
+Imports tickets from external systems (mail, chat) in batches. Each batch is a
+single round trip: a MERGE inserts tickets whose ExternalRef doesn't exist yet
+and returns the generated ids through OUTPUT inserted.TicketId (no SELECT
+MAX(TicketId)), then the ids of already-imported refs are looked up by join.
+A ref repeated in the input is inserted once, for its first row with a known
+customer; the other rows report that ticket as a duplicate.
+
+Usage:
+    python ticket_ingest.py tickets.csv   # columns: CustomerId, Subject, ExternalRef
+"""
+
+import sys
+import time
+
+from db_connection import get_connection
+
+# SQL Server allows 2100 parameters per statement; each ticket uses 3
+MAX_BATCH_SIZE = 690
+DEFAULT_BATCH_SIZE = 500
+SUBJECT_MAX_LENGTH = 200
+EXTERNAL_REF_MAX_LENGTH = 100
+
+def build_merge(row_count):
+    """Statement batch for `row_count` tickets. Returns rows of (RowNo, Action, TicketId)."""
+    rows = ',\n'.join(
+        f"({i}, CAST(? AS INT), CAST(? AS VARCHAR(200)), CAST(? AS NVARCHAR(100)))"
+        for i in range(row_count)
+    )
+    # HOLDLOCK keeps two concurrent imports from both inserting the same ExternalRef.
+    # Only NOT MATCHED rows are touched, so existing tickets are never updated or
+    # X-locked; their ids are read afterwards with a plain join on ExternalRef.
+    # Within the batch only the first row per ref with a known customer is a
+    # candidate, so a rejected first occurrence doesn't block a valid later one.
+    return f"""
+        SET NOCOUNT ON;
+        DECLARE @Src TABLE (RowNo INT PRIMARY KEY, CustomerId INT, Subject VARCHAR(200), ExternalRef NVARCHAR(100));
+        DECLARE @Inserted TABLE (RowNo INT PRIMARY KEY, TicketId INT);
+        
+        INSERT INTO @Src (RowNo, CustomerId, Subject, ExternalRef) VALUES
+{rows};
+        
+        MERGE SupportTicket WITH (HOLDLOCK) AS t
+        USING (
+            SELECT RowNo, CustomerId, Subject, ExternalRef
+            FROM (
+                SELECT s.RowNo, s.CustomerId, s.Subject, s.ExternalRef,
+                       ROW_NUMBER() OVER (PARTITION BY s.ExternalRef ORDER BY s.RowNo) AS Occurrence
+                FROM @Src s
+                JOIN Customer c ON c.CustomerId = s.CustomerId
+            ) v
+            WHERE ExternalRef IS NULL OR Occurrence = 1
+        ) AS s
+        ON t.ExternalRef = s.ExternalRef
+        WHEN NOT MATCHED BY TARGET THEN
+            INSERT (CustomerId, Subject, Status, ExternalRef)
+            VALUES (s.CustomerId, s.Subject, 'Open', s.ExternalRef)
+        OUTPUT s.RowNo, inserted.TicketId INTO @Inserted;
+        
+        -- Duplicates are matched on ExternalRef alone, whatever their CustomerId
+        SELECT RowNo, 'INSERT' AS Action, TicketId FROM @Inserted
+        UNION ALL
+        SELECT s.RowNo, 'DUPLICATE', t.TicketId
+        FROM @Src s
+        JOIN SupportTicket t ON t.ExternalRef = s.ExternalRef
+        WHERE NOT EXISTS (SELECT 1 FROM @Inserted i WHERE i.RowNo = s.RowNo);
+    """
+
+def external_ref_of(ticket):
+    """ExternalRef of an input ticket as a string (None if missing or empty)."""
+    external_ref = ticket.get('ExternalRef', ticket.get('external_ref'))
+    return str(external_ref) if external_ref not in (None, '') else None
+
+def normalize_ticket(ticket):
+    """
+    Accept dicts with CustomerId/Subject/ExternalRef (or snake_case) keys.
+    CustomerId becomes None when it is missing or not a number, so the row is
+    rejected by the batch instead of aborting the whole import.
+    Returns None (row rejected) when ExternalRef is longer than the column:
+    NVARCHAR(100) would truncate it and match a different ref.
+    """
+    customer_id = ticket.get('CustomerId', ticket.get('customer_id'))
+    subject = ticket.get('Subject', ticket.get('subject')) or ''
+    external_ref = external_ref_of(ticket)
+    if external_ref is not None and len(external_ref) > EXTERNAL_REF_MAX_LENGTH:
+        return None
+    try:
+        customer_id = int(customer_id)
+    except (TypeError, ValueError):
+        customer_id = None
+    return (customer_id, str(subject)[:SUBJECT_MAX_LENGTH], external_ref)
+
+def ingest_tickets(tickets, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Insert many tickets, deduplicating by ExternalRef.
+
+    Returns a dict with:
+        results - one entry per input ticket: {ExternalRef, TicketId, Status}
+                  Status is 'created', 'duplicate' (TicketId = existing ticket)
+                  or 'rejected' (missing, invalid or unknown CustomerId,
+                  or ExternalRef too long)
+        batches - per-batch stats: rows, created, duplicates, rejected, seconds, rows_per_sec
+        created / duplicates / rejected / seconds / rows_per_sec - totals
+    """
+    batch_size = max(1, min(batch_size, MAX_BATCH_SIZE))
+    tickets = list(tickets)
+    results = [{'ExternalRef': external_ref_of(t), 'TicketId': None, 'Status': 'rejected'} for t in tickets]
+    # Repeated refs are resolved by the batch (or by the next batch's join)
+    rows = [(index, row) for index, row in enumerate(normalize_ticket(t) for t in tickets) if row is not None]
+
+    batches = []
+    start = time.perf_counter()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        for offset in range(0, len(rows), batch_size):
+            batch = rows[offset:offset + batch_size]
+            params = [value for _, row in batch for value in row]
+
+            batch_start = time.perf_counter()
+            cursor.execute(build_merge(len(batch)), params)
+            output = cursor.fetchall()
+            conn.commit()
+            elapsed = time.perf_counter() - batch_start
+
+            created = duplicates = 0
+            for row_no, action, ticket_id in output:
+                index = batch[row_no][0]
+                results[index]['TicketId'] = ticket_id
+                if action == 'INSERT':
+                    results[index]['Status'] = 'created'
+                    created += 1
+                else:
+                    results[index]['Status'] = 'duplicate'
+                    duplicates += 1
+
+            batches.append({
+                'rows': len(batch),
+                'created': created,
+                'duplicates': duplicates,
+                'rejected': len(batch) - len(output),
+                'seconds': elapsed,
+                'rows_per_sec': len(batch) / elapsed if elapsed else 0.0,
+            })
+    total_seconds = time.perf_counter() - start
+
+    return {
+        'results': results,
+        'batches': batches,
+        'created': sum(1 for r in results if r['Status'] == 'created'),
+        'duplicates': sum(1 for r in results if r['Status'] == 'duplicate'),
+        'rejected': sum(1 for r in results if r['Status'] == 'rejected'),
+        'seconds': total_seconds,
+        'rows_per_sec': len(tickets) / total_seconds if total_seconds else 0.0,
+    }
+
+def create_ticket(customer_id, subject, external_ref=None):
+    """Create a single ticket and return its TicketId (None if the customer doesn't exist)."""
+    result = ingest_tickets([{'CustomerId': customer_id, 'Subject': subject, 'ExternalRef': external_ref}])
+    return result['results'][0]['TicketId']
+
+
+if __name__ == "__main__":
+    import pandas as pd
+
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    df = pd.read_csv(sys.argv[1], dtype={'ExternalRef': str})
+    df = df.astype(object).where(df.notna(), None)
+    summary = ingest_tickets(df.to_dict('records'))
+    for n, b in enumerate(summary['batches'], 1):
+        print(f"Batch {n}: {b['rows']} rows, {b['created']} created, {b['duplicates']} duplicates, "
+              f"{b['rejected']} rejected in {b['seconds']:.2f}s ({b['rows_per_sec']:.0f} rows/sec)")
+    print(f"Total: {summary['created']} created, {summary['duplicates']} duplicates, "
+          f"{summary['rejected']} rejected in {summary['seconds']:.2f}s "
+          f"({summary['rows_per_sec']:.0f} rows/sec)")